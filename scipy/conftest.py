@@ -1,5 +1,5 @@
 # Pytest customization
-import json
+import functools
 import multiprocessing
 import os
 import sys
@@ -37,6 +37,60 @@ try:
 except Exception:
     PARALLEL_RUN_AVAILABLE = False
 
+# Older versions of threadpoolctl have an issue that may lead to this
+# warning being emitted, see gh-14441
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", pytest.PytestUnraisableExceptionWarning)
+    try:
+        from threadpoolctl import threadpool_limits
+        HAS_THREADPOOLCTL = True
+    except Exception:  # observed in gh-14441: (ImportError, AttributeError)
+        # Optional dependency only. All exceptions are caught, for robustness
+        HAS_THREADPOOLCTL = False
+
+try:
+    import pytest_timeout  # noqa:F401
+    HAS_PYTEST_TIMEOUT = True
+except Exception:
+    HAS_PYTEST_TIMEOUT = False
+
+try:
+    # This is a more reliable test of whether pytest_fail_slow is installed
+    # When I uninstalled it, `import pytest_fail_slow` didn't fail!
+    from pytest_fail_slow import parse_duration  # type: ignore[import-not-found] # noqa:F401,E501
+    HAS_PYTEST_FAIL_SLOW = True
+except Exception:
+    HAS_PYTEST_FAIL_SLOW = False
+
+
+# SciPy-specific markers, registered in `pytest_configure`
+_SCIPY_MARKERS = (
+    "slow: Tests that are very slow.",
+    "xslow: mark test as extremely slow (not run unless explicitly requested)",
+    "xfail_on_32bit: mark test as failing on 32-bit platforms",
+    "array_api_backends: test iterates on all array API backends",
+    ("fail_asan: mark test as triggering the address sanitizer "
+     "(and not covered by the suppressions file)"),
+    ("skip_xp_backends(backends, reason=None, np_only=False, cpu_only=False, "
+     "eager_only=False, exceptions=None): mark the desired skip configuration "
+     "for the `skip_xp_backends` fixture"),
+    ("xfail_xp_backends(backends, reason=None, np_only=False, cpu_only=False, "
+     "eager_only=False, exceptions=None): mark the desired xfail configuration "
+     "for the `xfail_xp_backends` fixture"),
+    ("uses_xp_capabilities(status, funcs=None, reason=None): mark "
+     "whether pytest markers for array API backends are "
+     " generated from the xp_capabilities entries for one or "
+     " more functions"),
+)
+
+# Fallbacks for the markers provided by pytest-run-parallel
+_PARALLEL_RUN_MARKERS = (
+    ("parallel_threads_limit(n): run the given test function in parallel "
+     "using `n` threads."),
+    "thread_unsafe: mark the test function as single-threaded",
+    "iterations(n): run the given test function `n` times in each thread",
+)
+
 
 def pytest_configure(config):
     """
@@ -47,58 +101,19 @@ def pytest_configure(config):
 
     Note that we need both the registration here *and* in `pytest.ini`.
     """
-    config.addinivalue_line("markers",
-        "slow: Tests that are very slow.")
-    config.addinivalue_line("markers",
-        "xslow: mark test as extremely slow (not run unless explicitly requested)")
-    config.addinivalue_line("markers",
-        "xfail_on_32bit: mark test as failing on 32-bit platforms")
-    config.addinivalue_line("markers",
-        "array_api_backends: test iterates on all array API backends")
-    config.addinivalue_line("markers",
-        ("fail_asan: mark test as triggering the address sanitizer "
-         "(and not covered by the suppressions file)"))
-    config.addinivalue_line("markers",
-        ("skip_xp_backends(backends, reason=None, np_only=False, cpu_only=False, " +
-         "eager_only=False, exceptions=None): mark the desired skip configuration " +
-         "for the `skip_xp_backends` fixture"))
-    config.addinivalue_line("markers",
-        ("xfail_xp_backends(backends, reason=None, np_only=False, cpu_only=False, " +
-         "eager_only=False, exceptions=None): mark the desired xfail configuration " +
-         "for the `xfail_xp_backends` fixture"))
-    config.addinivalue_line("markers",
-                            ("uses_xp_capabilities(status, funcs=None, " +
-                             "reason=None): mark " +
-                            "whether pytest markers for array API backends are " +
-                            " generated from the xp_capabilities entries for one or "
-                             " more functions"))
+    for marker in _SCIPY_MARKERS:
+        config.addinivalue_line("markers", marker)
 
-    try:
-        import pytest_timeout  # noqa:F401
-    except Exception:
+    # dummy fallbacks for markers defined in optional test packages
+    if not HAS_PYTEST_TIMEOUT:
         config.addinivalue_line(
             "markers", 'timeout: mark a test for a non-default timeout')
-    try:
-        # This is a more reliable test of whether pytest_fail_slow is installed
-        # When I uninstalled it, `import pytest_fail_slow` didn't fail!
-        from pytest_fail_slow import parse_duration  # type: ignore[import-not-found] # noqa:F401,E501
-    except Exception:
+    if not HAS_PYTEST_FAIL_SLOW:
         config.addinivalue_line(
             "markers", 'fail_slow: mark a test for a non-default timeout failure')
-
     if not PARALLEL_RUN_AVAILABLE:
-        config.addinivalue_line(
-            'markers',
-            'parallel_threads_limit(n): run the given test function in parallel '
-            'using `n` threads.')
-        config.addinivalue_line(
-            "markers",
-            "thread_unsafe: mark the test function as single-threaded",
-        )
-        config.addinivalue_line(
-            "markers",
-            "iterations(n): run the given test function `n` times in each thread",
-        )
+        for marker in _PARALLEL_RUN_MARKERS:
+            config.addinivalue_line("markers", marker)
 
     if os.name == 'posix' and sys.version_info < (3, 14) and sys.platform != "cygwin":
         # On POSIX, Python 3.13 and older uses the 'fork' context by
@@ -107,76 +122,125 @@ def pytest_configure(config):
         multiprocessing.set_start_method('forkserver', force=True)
 
 
+def _xdist_threads_per_worker():
+    """Return the number of BLAS threads a pytest-xdist worker may use.
+
+    Returns None when not running under pytest-xdist, or when the number of
+    threads is already controlled by the user through ``OMP_NUM_THREADS``.
+    """
+    # Set the number of openmp threads based on the number of workers
+    # xdist is using to prevent oversubscription. Simplified version of what
+    # sklearn does (it can rely on threadpoolctl and its builtin OpenMP helper
+    # functions)
+    try:
+        xdist_worker_count = int(os.environ['PYTEST_XDIST_WORKER_COUNT'])
+    except KeyError:
+        # raises when pytest-xdist is not installed
+        return None
+
+    if os.getenv('OMP_NUM_THREADS'):
+        return None
+
+    # use nr of physical cores; `os.cpu_count()` may return None
+    max_openmp_threads = (os.cpu_count() or 1) // 2
+    return max(max_openmp_threads // xdist_worker_count, 1)
+
+
+def _limit_blas_threads():
+    """Limit the number of BLAS threads used by a pytest-xdist worker.
+
+    `threadpool_limits` only affects libraries that are already loaded.
+    SciPy's own BLAS is loaded by the test modules, so this must run after
+    collection (see `pytest_collection_finish`).
+    """
+    if not HAS_THREADPOOLCTL:
+        return
+
+    threads_per_worker = _xdist_threads_per_worker()
+    if threads_per_worker is None:
+        return
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", pytest.PytestUnraisableExceptionWarning)
+        try:
+            threadpool_limits(threads_per_worker, user_api='blas')
+        except Exception:
+            # May raise AttributeError for older versions of OpenBLAS.
+            # Catch any error for robustness.
+            pass
+
+
+def pytest_collection_finish(session):
+    # Test modules have been imported by now, and with them every BLAS
+    # library they link against, so limit the threads once here rather
+    # than before every test.
+    _limit_blas_threads()
+
+
+try:
+    _RUN_XSLOW = bool(int(os.environ.get('SCIPY_XSLOW', '0')))
+except ValueError:
+    _RUN_XSLOW = False
+_IS_32BIT = np.intp(0).itemsize < 8
+
+
 def pytest_runtest_setup(item):
     mark = item.get_closest_marker("xslow")
-    if mark is not None:
-        try:
-            v = int(os.environ.get('SCIPY_XSLOW', '0'))
-        except ValueError:
-            v = False
-        if not v:
-            pytest.skip("very slow test; "
-                        "set environment variable SCIPY_XSLOW=1 to run it")
+    if mark is not None and not _RUN_XSLOW:
+        pytest.skip("very slow test; "
+                    "set environment variable SCIPY_XSLOW=1 to run it")
     mark = item.get_closest_marker("xfail_on_32bit")
-    if mark is not None and np.intp(0).itemsize < 8:
+    if mark is not None and _IS_32BIT:
         pytest.xfail(f'Fails on our 32-bit test platform(s): {mark.args[0]}')
 
-    # Older versions of threadpoolctl have an issue that may lead to this
-    # warning being emitted, see gh-14441
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore", pytest.PytestUnraisableExceptionWarning)
 
-        try:
-            from threadpoolctl import threadpool_limits
-
-            HAS_THREADPOOLCTL = True
-        except Exception:  # observed in gh-14441: (ImportError, AttributeError)
-            # Optional dependency only. All exceptions are caught, for robustness
-            HAS_THREADPOOLCTL = False
-
-        if HAS_THREADPOOLCTL:
-            # Set the number of openmp threads based on the number of workers
-            # xdist is using to prevent oversubscription. Simplified version of what
-            # sklearn does (it can rely on threadpoolctl and its builtin OpenMP helper
-            # functions)
-            try:
-                xdist_worker_count = int(os.environ['PYTEST_XDIST_WORKER_COUNT'])
-            except KeyError:
-                # raises when pytest-xdist is not installed
-                return
-
-            if not os.getenv('OMP_NUM_THREADS'):
-                max_openmp_threads = os.cpu_count() // 2  # use nr of physical cores
-                threads_per_worker = max(max_openmp_threads // xdist_worker_count, 1)
-                try:
-                    threadpool_limits(threads_per_worker, user_api='blas')
-                except Exception:
-                    # May raise AttributeError for older versions of OpenBLAS.
-                    # Catch any error for robustness.
-                    return
+# The FPU mode check runs around every test; allow opting out of it entirely.
+try:
+    _SKIP_FPU_MODE_CHECK = bool(int(os.environ.get('SCIPY_SKIP_FPU_MODE_CHECK', '0')))
+except ValueError:
+    _SKIP_FPU_MODE_CHECK = False
+_FPU_MODE_CHANGED_MSG = "FPU mode changed from {:#x} to {:#x} during the test"
 
 
 @pytest.fixture(scope="function", autouse=True)
-def check_fpu_mode(request):
+def check_fpu_mode(request, _get_fpu_mode=get_fpu_mode):
     """
     Check FPU mode was not changed during the test.
     """
-    old_mode = get_fpu_mode()
+    if _SKIP_FPU_MODE_CHECK:
+        yield
+        return
+
+    old_mode = _get_fpu_mode()
     yield
-    new_mode = get_fpu_mode()
+    new_mode = _get_fpu_mode()
 
     if old_mode != new_mode:
-        warnings.warn(f"FPU mode changed from {old_mode:#x} to {new_mode:#x} during "
-                      "the test",
+        warnings.warn(_FPU_MODE_CHANGED_MSG.format(old_mode, new_mode),
                       category=FPUModeChangeWarning, stacklevel=0)
 
 
 if not PARALLEL_RUN_AVAILABLE:
-    @pytest.fixture
+    # Constant value, so let pytest compute it once per session
+    @pytest.fixture(scope="session")
     def num_parallel_threads():
         return 1
 
 
+def _parse_backends(value):
+    """Parse the list of backends requested through ``SCIPY_ARRAY_API``.
+
+    Accepts a JSON-style list of strings as written by ``spin test -b``,
+    e.g. ``'["numpy", "torch"]'``, or a single (optionally quoted) name.
+    """
+    value = value.strip()
+    if value.startswith("["):
+        names = value.strip("[]").split(",")
+    else:
+        names = [value]
+    return {name.strip().strip("'\"") for name in names} - {""}
+
+
 # Array API backend handling
 # NOTE: conftest.py is imported before its own ``pytest_configure`` runs, and
 # an installed SciPy does not ship ``pytest.ini``. Accessing
@@ -188,8 +252,8 @@ with warnings.catch_warnings():
     warnings.simplefilter("ignore", pytest.PytestUnknownMarkWarning)
     _array_api_backends = pytest.mark.array_api_backends
     _thread_unsafe = pytest.mark.thread_unsafe
-xp_known_backends = {'numpy', 'array_api_strict', 'torch', 'cupy', 'jax.numpy',
-                     'dask.array'}
+xp_known_backends = frozenset({'numpy', 'array_api_strict', 'torch', 'cupy',
+                               'jax.numpy', 'dask.array'})
 xp_available_backends = [
     pytest.param(np, id='numpy', marks=_array_api_backends)
 ]
@@ -197,121 +261,163 @@ xp_skip_cpu_only_backends = set()
 xp_skip_eager_only_backends = set()
 
 if SCIPY_ARRAY_API:
-    # fill the dict of backends with available libraries
-    try:
-        import array_api_strict
-        xp_available_backends.append(
-            pytest.param(array_api_strict, id='array_api_strict',
-                         marks=_array_api_backends))
-        if version.parse(array_api_strict.__version__) < version.Version('2.3'):
-            raise ImportError("array-api-strict must be >= version 2.3")
-        array_api_strict.set_array_api_strict_flags(
-            api_version='2025.12'
-        )
-    except ImportError:
-        pass
+    # Parse the requested backends first, so that libraries which were not
+    # requested are not imported at all: importing e.g. torch or jax is slow
+    # and memory hungry, and every pytest-xdist worker would pay for it.
+    # By default, use all available backends.
+    if (
+        isinstance(SCIPY_ARRAY_API, str)
+        and SCIPY_ARRAY_API.lower() not in ("1", "true", "all")
+    ):
+        SCIPY_ARRAY_API_ = _parse_backends(SCIPY_ARRAY_API)
+    else:
+        SCIPY_ARRAY_API_ = {'all'}
 
-    try:
-        import torch  # type: ignore[import-not-found]
-        xp_available_backends.append(
-            pytest.param(torch, id='torch',
-            marks=_array_api_backends))
-        torch.set_default_device(SCIPY_DEVICE)
-        if SCIPY_DEVICE != "cpu":
-            xp_skip_cpu_only_backends.add('torch')
-
-        # default to float64 unless explicitly requested
-        default = os.getenv('SCIPY_DEFAULT_DTYPE', default='float64')
-        if default == 'float64':
-            torch.set_default_dtype(torch.float64)
-        elif default != "float32":
-            raise ValueError(
-                "SCIPY_DEFAULT_DTYPE env var, if set, can only be either 'float64' "
-               f"or 'float32'. Got '{default}' instead."
-            )
-    except ImportError:
-        pass
+    def _requested(backend):
+        return SCIPY_ARRAY_API_ == {'all'} or backend in SCIPY_ARRAY_API_
 
-    try:
-        import cupy  # type: ignore[import-not-found]
-        # Note: cupy disregards SCIPY_DEVICE and always runs on cuda.
-        # It will fail to import if you don't have CUDA hardware and drivers.
-        xp_available_backends.append(
-            pytest.param(cupy, id='cupy',
-            marks=_array_api_backends))
-        xp_skip_cpu_only_backends.add('cupy')
-
-        # this is annoying in CuPy 13.x
-        warnings.filterwarnings(
-            'ignore', 'cupyx.jit.rawkernel is experimental', category=FutureWarning
-        )
-        from cupyx.scipy import signal
-        del signal
-    except ImportError:
-        pass
+    # fill the dict of backends with available libraries
+    if _requested('array_api_strict'):
+        try:
+            import array_api_strict
+            xp_available_backends.append(
+                pytest.param(array_api_strict, id='array_api_strict',
+                             marks=_array_api_backends))
+            if version.parse(array_api_strict.__version__) < version.Version('2.3'):
+                raise ImportError("array-api-strict must be >= version 2.3")
+            array_api_strict.set_array_api_strict_flags(
+                api_version='2025.12'
+            )
+        except ImportError:
+            pass
 
-    try:
-        import jax.numpy  # type: ignore[import-not-found]
-        
-        xp_available_backends.append(
-            pytest.param(jax.numpy, id='jax.numpy',
-            marks=[_array_api_backends,
-                   # Uses xpx.testing.patch_lazy_xp_functions to monkey-patch module
-                   _thread_unsafe]))
-
-        jax.config.update("jax_enable_x64", True)
-        # Make sure JAX won't default to less accurate TensorFloat32 precision
-        # in matmuls with float32 inputs on GPUs that support this floating
-        # point format.
-        jax.config.update("jax_default_matmul_precision", "float32")
-        jax.config.update("jax_default_device", jax.devices(SCIPY_DEVICE)[0])
-        if SCIPY_DEVICE != "cpu":
-            xp_skip_cpu_only_backends.add('jax.numpy')
-        # JAX can be eager or lazy (when wrapped in jax.jit). However it is
-        # recommended by upstream devs to assume it's always lazy.
-        xp_skip_eager_only_backends.add('jax.numpy')
-    except ImportError:
-        pass
+    if _requested('torch'):
+        try:
+            import torch  # type: ignore[import-not-found]
+            xp_available_backends.append(
+                pytest.param(torch, id='torch',
+                marks=_array_api_backends))
+            torch.set_default_device(SCIPY_DEVICE)
+            if SCIPY_DEVICE != "cpu":
+                xp_skip_cpu_only_backends.add('torch')
+
+            # default to float64 unless explicitly requested
+            default = os.getenv('SCIPY_DEFAULT_DTYPE', default='float64')
+            if default == 'float64':
+                torch.set_default_dtype(torch.float64)
+            elif default != "float32":
+                raise ValueError(
+                    "SCIPY_DEFAULT_DTYPE env var, if set, can only be either 'float64' "
+                   f"or 'float32'. Got '{default}' instead."
+                )
+        except ImportError:
+            pass
+
+    if _requested('cupy'):
+        try:
+            import cupy  # type: ignore[import-not-found]
+            # Note: cupy disregards SCIPY_DEVICE and always runs on cuda.
+            # It will fail to import if you don't have CUDA hardware and drivers.
+            xp_available_backends.append(
+                pytest.param(cupy, id='cupy',
+                marks=_array_api_backends))
+            xp_skip_cpu_only_backends.add('cupy')
+
+            # this is annoying in CuPy 13.x
+            warnings.filterwarnings(
+                'ignore', 'cupyx.jit.rawkernel is experimental', category=FutureWarning
+            )
+            from cupyx.scipy import signal
+            del signal
+        except ImportError:
+            pass
 
-    try:
-        import dask.array as da
+    if _requested('jax.numpy'):
+        try:
+            import jax.numpy  # type: ignore[import-not-found]
+
+            xp_available_backends.append(
+                pytest.param(jax.numpy, id='jax.numpy',
+                marks=[_array_api_backends,
+                       # Uses xpx.testing.patch_lazy_xp_functions to monkey-patch module
+                       _thread_unsafe]))
+
+            jax.config.update("jax_enable_x64", True)
+            # Make sure JAX won't default to less accurate TensorFloat32 precision
+            # in matmuls with float32 inputs on GPUs that support this floating
+            # point format.
+            jax.config.update("jax_default_matmul_precision", "float32")
+            # The default device is selected lazily by the `xp` fixture, see
+            # `_set_jax_default_device`
+            if SCIPY_DEVICE != "cpu":
+                xp_skip_cpu_only_backends.add('jax.numpy')
+            # JAX can be eager or lazy (when wrapped in jax.jit). However it is
+            # recommended by upstream devs to assume it's always lazy.
+            xp_skip_eager_only_backends.add('jax.numpy')
+        except ImportError:
+            pass
+
+    if _requested('dask.array'):
+        try:
+            import dask.array as da
 
-        xp_available_backends.append(
-            pytest.param(da, id='dask.array',
-            marks=[_array_api_backends,
-                   # Uses xpx.testing.patch_lazy_xp_functions to monkey-patch module
-                   _thread_unsafe]))
+            xp_available_backends.append(
+                pytest.param(da, id='dask.array',
+                marks=[_array_api_backends,
+                       # Uses xpx.testing.patch_lazy_xp_functions to monkey-patch module
+                       _thread_unsafe]))
 
-        # Dask can wrap around cupy. However, this is untested in scipy
-        # (and will almost surely not work as delegation will misbehave).
+            # Dask can wrap around cupy. However, this is untested in scipy
+            # (and will almost surely not work as delegation will misbehave).
 
-        # Dask, strictly speaking, can be eager, in the sense that
-        # __array__, __bool__ etc. are implemented and do not raise.
-        # However, calling them triggers an extra computation of the whole graph
-        # until that point, which is highly destructive for performance.
-        xp_skip_eager_only_backends.add('dask.array')
-    except ImportError:
-        pass
+            # Dask, strictly speaking, can be eager, in the sense that
+            # __array__, __bool__ etc. are implemented and do not raise.
+            # However, calling them triggers an extra computation of the whole graph
+            # until that point, which is highly destructive for performance.
+            xp_skip_eager_only_backends.add('dask.array')
+        except ImportError:
+            pass
 
     xp_available_backend_ids = {p.id for p in xp_available_backends}
     assert not xp_available_backend_ids - xp_known_backends
 
-    # by default, use all available backends
-    if (
-        isinstance(SCIPY_ARRAY_API, str)
-        and SCIPY_ARRAY_API.lower() not in ("1", "true", "all")
-    ):
-        SCIPY_ARRAY_API_ = set(json.loads(SCIPY_ARRAY_API))
-        if SCIPY_ARRAY_API_ != {'all'}:
-            if SCIPY_ARRAY_API_ - xp_available_backend_ids:
-                msg = ("'--array-api-backend' must be in "
-                       f"{xp_available_backend_ids}; got {SCIPY_ARRAY_API_}")
-                raise ValueError(msg)
-            # Only select a subset of backends
-            xp_available_backends = [
-                param for param in xp_available_backends
-                if param.id in SCIPY_ARRAY_API_
-            ]
+    if SCIPY_ARRAY_API_ != {'all'}:
+        if SCIPY_ARRAY_API_ - xp_available_backend_ids:
+            msg = ("'--array-api-backend' must be in "
+                   f"{xp_available_backend_ids}; got {SCIPY_ARRAY_API_}")
+            raise ValueError(msg)
+        # Only select a subset of backends
+        xp_available_backends = [
+            param for param in xp_available_backends
+            if param.id in SCIPY_ARRAY_API_
+        ]
+
+
+# These are only populated above; freeze them for the marker processing below
+xp_skip_cpu_only_backends = frozenset(xp_skip_cpu_only_backends)
+xp_skip_eager_only_backends = frozenset(xp_skip_eager_only_backends)
+
+# Reverse lookup of backend module -> backend name, for the `xp` fixture
+_xp_backend_names = {param.values[0]: param.id for param in xp_available_backends}
+
+# Cache of backend module -> (potentially wrapped) namespace, for the `xp` fixture
+_xp_namespaces = {}
+
+_jax_device_set = False
+
+
+def _set_jax_default_device():
+    """Select JAX's default device the first time the `xp` fixture uses JAX.
+
+    This is not done at import time because `jax.devices` initializes the XLA
+    runtime, which is slow and may allocate device memory in every
+    pytest-xdist worker, even if none of its tests uses JAX.
+    """
+    global _jax_device_set
+    import jax  # type: ignore[import-not-found]
+
+    jax.config.update("jax_default_device", jax.devices(SCIPY_DEVICE)[0])
+    _jax_device_set = True
 
 
 @pytest.fixture(params=xp_available_backends)
@@ -347,14 +453,20 @@ def xp(request):
             stacklevel=0,
         )
 
-    xp = request.param
-    # Potentially wrap namespace with array_api_compat
-    xp = array_namespace(xp.empty(0))
+    backend = request.param
+    if not _jax_device_set and _xp_backend_names[backend] == 'jax.numpy':
+        _set_jax_default_device()
+
+    # Potentially wrap namespace with array_api_compat. The result only depends
+    # on the backend, so cache it rather than allocating an array on every call.
+    xp = _xp_namespaces.get(backend)
+    if xp is None:
+        xp = _xp_namespaces[backend] = array_namespace(backend.empty(0))
 
     if SCIPY_ARRAY_API:
         # If xp==jax.numpy, wrap tested functions in jax.jit
         # If xp==dask.array, wrap tested functions to test that graph is not computed
-        with patch_lazy_xp_functions(request=request, xp=request.param):
+        with patch_lazy_xp_functions(request=request, xp=backend):
             # Throughout all calls to assert_almost_equal, assert_array_almost_equal,
             # and xp_assert_* functions, test that the array namespace is xp in both
             # the expected and actual arrays. This is to detect the case where both
@@ -373,41 +485,50 @@ skip_xp_invalid_arg = pytest.mark.skipif(SCIPY_ARRAY_API,
 def _backends_kwargs_from_request(request, skip_or_xfail):
     """A helper for {skip,xfail}_xp_backends.
 
-    Return dict of {backend to skip/xfail: top reason to skip/xfail it}
+    Return dict of {backend to skip/xfail: top reason to skip/xfail it}.
+    A reason given for an explicit backend overrides the default ones from
+    ``cpu_only``, ``np_only`` and ``eager_only``, regardless of the order of
+    appearance of the markers; otherwise the first reason seen wins.
     """
-    markers = list(request.node.iter_markers(f'{skip_or_xfail}_xp_backends'))
-    reasons = {backend: [] for backend in xp_known_backends}
+    # Only backends that actually get a reason are stored, so there is nothing
+    # to allocate up front when the test has no matching markers. Callers
+    # normally check ``request.keywords`` first, which also covers markers
+    # inherited from classes, modules and ``pytest.param``.
+    reasons: dict[str, str] = {}
 
-    for marker in markers:
+    for marker in request.node.iter_markers(f'{skip_or_xfail}_xp_backends'):
         invalid_kwargs = set(marker.kwargs) - {
             "cpu_only", "np_only", "eager_only", "reason", "exceptions"}
         if invalid_kwargs:
             raise TypeError(f"Invalid kwargs: {invalid_kwargs}")
 
-        exceptions = set(marker.kwargs.get('exceptions', []))
-        invalid_exceptions = exceptions - xp_known_backends
-        if (invalid_exceptions := list(exceptions - xp_known_backends)):
+        exceptions = frozenset(marker.kwargs.get('exceptions', ()))
+        if exceptions and (invalid_exceptions := list(exceptions - xp_known_backends)):
             raise ValueError(f"Unknown backend(s): {invalid_exceptions}; "
                              f"must be a subset of {list(xp_known_backends)}")
 
         if marker.kwargs.get('np_only', False):
             reason = marker.kwargs.get("reason") or "do not run with non-NumPy backends"
-            for backend, backend_reasons in reasons.items():
+            for backend in xp_known_backends:
                 if backend != 'numpy' and backend not in exceptions:
-                    backend_reasons.append(reason)
+                    reasons.setdefault(backend, reason)
 
         elif marker.kwargs.get('cpu_only', False):
             reason = marker.kwargs.get("reason") or (
                 "no array-agnostic implementation or delegation available "
                 "for this backend and device")
-            for backend in xp_skip_cpu_only_backends - exceptions:
-                reasons[backend].append(reason)
+            backends = (xp_skip_cpu_only_backends - exceptions if exceptions
+                        else xp_skip_cpu_only_backends)
+            for backend in backends:
+                reasons.setdefault(backend, reason)
 
         elif marker.kwargs.get('eager_only', False):
             reason = marker.kwargs.get("reason") or (
                 "eager checks not executed on lazy backends")
-            for backend in xp_skip_eager_only_backends - exceptions:
-                reasons[backend].append(reason)
+            backends = (xp_skip_eager_only_backends - exceptions if exceptions
+                        else xp_skip_eager_only_backends)
+            for backend in backends:
+                reasons.setdefault(backend, reason)
 
         # add backends, if any
         if len(marker.args) == 1:
@@ -419,7 +540,7 @@ def _backends_kwargs_from_request(request, skip_or_xfail):
                 f"do not run with array API backend: {backend}")
             # reason overrides the ones from cpu_only, np_only, and eager_only.
             # This is regardless of order of appearance of the markers.
-            reasons[backend].insert(0, reason)
+            reasons[backend] = reason
 
             for kwarg in ("cpu_only", "np_only", "eager_only", "exceptions"):
                 if kwarg in marker.kwargs:
@@ -439,7 +560,7 @@ def _backends_kwargs_from_request(request, skip_or_xfail):
                 reason = marker.kwargs.get("reason")
                 # reason overrides the ones from cpu_only, np_only, and eager_only.
                 # This is regardless of order of appearance of the markers.
-                reasons[backend].insert(0, reason)
+                reasons[backend] = reason
 
             for kwarg in ("cpu_only", "np_only", "eager_only", "exceptions"):
                 if kwarg in marker.kwargs:
@@ -450,9 +571,7 @@ def _backends_kwargs_from_request(request, skip_or_xfail):
                 f"Please specify only one backend per marker: {marker.args}"
             )
 
-    return {backend: backend_reasons[0]
-            for backend, backend_reasons in reasons.items()
-            if backend_reasons}
+    return reasons
 
 
 def skip_or_xfail_xp_backends(request: pytest.FixtureRequest,
@@ -511,9 +630,9 @@ def skip_or_xfail_xp_backends(request: pytest.FixtureRequest,
     skip_xfail_reasons = _backends_kwargs_from_request(
         request, skip_or_xfail=skip_or_xfail
     )
-    xp = request.param
-    if xp.__name__ in skip_xfail_reasons:
-        reason = skip_xfail_reasons[xp.__name__]
+    backend = _xp_backend_names[request.param]
+    if backend in skip_xfail_reasons:
+        reason = skip_xfail_reasons[backend]
         assert reason  # Default reason applied above
         skip_or_xfail = getattr(pytest, skip_or_xfail)
         skip_or_xfail(reason=reason)
@@ -589,14 +708,16 @@ if hypothesis_available:
 # doctesting stuff
 
 if HAVE_SCPDT:
+    from scipy._lib._util import _fixed_default_rng
 
-    # FIXME: populate the dict once
-    @contextmanager
-    def warnings_errors_and_rng(test=None):
-        """Temporarily turn (almost) all warnings to errors.
+    # Built on first use: importing scipy.integrate pulls in much of scipy,
+    # which conftest import (and so every non-doctest run) should not pay for.
+    @functools.cache
+    def _known_doctest_warnings():
+        """Map doctest names to the `filterwarnings` kwargs of the warning
+        they are allowed to emit."""
+        from scipy.integrate import IntegrationWarning
 
-        Filter out known warnings which we allow.
-        """
         known_warnings = dict()
 
         # these functions are known to emit "divide by zero" RuntimeWarnings
@@ -612,13 +733,12 @@ if HAVE_SCPDT:
         for name in deprecated:
             known_warnings[name] = dict(category=DeprecationWarning)
 
-        from scipy import integrate
         # the functions are known to emit IntegrationWarnings
         integration_w = ['scipy.special.ellip_normal',
                          'scipy.special.ellip_harm_2',
         ]
         for name in integration_w:
-            known_warnings[name] = dict(category=integrate.IntegrationWarning,
+            known_warnings[name] = dict(category=IntegrationWarning,
                                         message='The occurrence of roundoff')
 
         # scipy.stats deliberately emits UserWarnings sometimes
@@ -637,13 +757,20 @@ if HAVE_SCPDT:
                      category=PendingDeprecationWarning),
             'stats.rst':
                 dict(message='The maximum number of subdivisions',
-                     category=integrate.IntegrationWarning),
+                     category=IntegrationWarning),
         }
         known_warnings.update(dct)
+        return known_warnings
 
-        # these legitimately emit warnings in examples
-        legit = set('scipy.signal.normalize')
+    # these legitimately emit warnings in examples
+    _LEGIT_DOCTEST_WARNINGS = {'scipy.signal.normalize'}
 
+    @contextmanager
+    def warnings_errors_and_rng(test=None):
+        """Temporarily turn (almost) all warnings to errors.
+
+        Filter out known warnings which we allow.
+        """
         # Now, the meat of the matter: filter warnings,
         # also control the random seed for each doctest.
 
@@ -651,23 +778,24 @@ if HAVE_SCPDT:
         # makes sure that the seed the old-fashioned np.random* methods is
         # *NOT* reproducible but the new-style `default_rng()` *IS* reproducible.
         # Should these two be either both repro or both not repro?
-
-        from scipy._lib._util import _fixed_default_rng
-        import numpy as np
         with _fixed_default_rng():
             np.random.seed(None)
-            with warnings.catch_warnings():
-                if test and test.name in known_warnings:
-                    warnings.filterwarnings('ignore', **known_warnings[test.name])
+            name = test.name if test else None
+            known_warnings = _known_doctest_warnings()
+            if name in known_warnings:
+                with warnings.catch_warnings():
+                    warnings.filterwarnings('ignore', **known_warnings[name])
                     yield
-                elif test and test.name in legit:
+            elif name in _LEGIT_DOCTEST_WARNINGS:
+                with warnings.catch_warnings():
                     yield
-                else:
-                    warnings.simplefilter('error', Warning)
+            else:
+                # let catch_warnings install the catch-all filter on entry
+                with warnings.catch_warnings(action='error', category=Warning):
                     yield
 
     dt_config.user_context_mgr = warnings_errors_and_rng  # pyrefly:ignore[unbound-name]
-    dt_config.skiplist = set([
+    dt_config.skiplist = frozenset({
         'scipy.linalg.LinAlgError',     # comes from numpy
         'scipy.fftpack.fftshift',       # fftpack stuff is also from numpy
         'scipy.fftpack.ifftshift',
@@ -692,11 +820,11 @@ if HAVE_SCPDT:
         'scipy.spatial.minkowski_distance_p',
         'scipy.spatial.minkowski_distance',
         'scipy.spatial.distance_matrix',
-    ])
+    })
 
     # help pytest collection a bit: these names are either private
     # (distributions), or just do not need doctesting.
-    dt_config.pytest_extra_ignore = [
+    dt_config.pytest_extra_ignore = (
         "scipy.stats.distributions",
         "scipy.optimize.cython_optimize",
         "scipy.test",
@@ -724,7 +852,7 @@ if HAVE_SCPDT:
         "scipy/sparse/_generate_sparsetools.py",
         "scipy/special/_generate_pyx.py",
         "scipy/stats/_stats_pythran.py",
-    ]
+    )
 
     dt_config.pytest_extra_xfail = {
         # name: reason
@@ -1,48 +1,35 @@
+import functools
 import itertools
 import numpy as np
 from numpy.testing import assert_allclose
+import pytest
 from scipy.integrate import ode
 
 
 def _band_count(a):
     """Returns ml and mu, the lower and upper band sizes of a."""
-    nrows, ncols = a.shape
-    ml = 0
-    for k in range(-nrows+1, 0):
-        if np.diag(a, k).any():
-            ml = -k
-            break
-    mu = 0
-    for k in range(nrows-1, 0, -1):
-        if np.diag(a, k).any():
-            mu = k
-            break
+    rows, cols = np.nonzero(a)
+    if rows.size == 0:
+        return 0, 0
+    d = rows - cols
+    ml = int(max(d.max(), 0))
+    mu = int(max(-d.min(), 0))
     return ml, mu
 
 
-def _linear_func(t, y, a):
-    """Linear system dy/dt = a * y"""
-    return a.dot(y)
-
-
-def _linear_jac(t, y, a):
-    """Jacobian of a * y is a."""
-    return a
-
-
-def _linear_banded_jac(t, y, a):
-    """Banded Jacobian."""
-    ml, mu = _band_count(a)
-    bjac = [np.r_[[0] * k, np.diag(a, k)] for k in range(mu, 0, -1)]
-    bjac.append(np.diag(a))
-    for k in range(-1, -ml-1, -1):
-        bjac.append(np.r_[np.diag(a, k), [0] * (-k)])
+def _banded_jac_matrix(a, ml, mu):
+    """Banded storage of a, i.e. ``bjac[i - j + mu, j] = a[i, j]``."""
+    n = a.shape[0]
+    bjac = np.zeros((ml + mu + 1, n), dtype=a.dtype)
+    for k in range(-ml, mu + 1):
+        bjac[mu - k, max(k, 0):n + min(k, 0)] = np.diag(a, k)
     return bjac
 
 
 def _solve_linear_sys(a, y0, tend=1, dt=0.1,
                       solver=None, method='bdf', use_jac=True,
-                      with_jacobian=False, banded=False):
+                      with_jacobian=False, banded=False,
+                      lband=None, uband=None):
     """Use scipy.integrate.ode to solve a linear system of ODEs.
 
     a : square ndarray
@@ -63,28 +50,44 @@ def _solve_linear_sys(a, y0, tend=1, dt=0.1,
         Passed to ode.set_integrator().
     banded : bool
         Determines whether a banded or full jacobian is used.
-        If `banded` is True, `lband` and `uband` are determined by the
-        values in `a`.
+        If `banded` is True and `lband` or `uband` is None, both are
+        determined by the values in `a`.
+    lband, uband : int, optional
+        Lower and upper band widths of `a`, if already known. Only used
+        when `banded` is True.
     """
     if banded:
-        lband, uband = _band_count(a)
+        if lband is None or uband is None:
+            lband, uband = _band_count(a)
     else:
         lband = None
         uband = None
 
+    # The callbacks bind `a` directly rather than receiving it through
+    # set_f_params/set_jac_params on every call. For these 5x5 matrices
+    # `ndarray.dot` is cheaper than calling BLAS gemv via scipy.linalg.blas,
+    # whose f2py argument handling costs more than the product itself.
+    def f(t, y, _a=a):
+        """Linear system dy/dt = a * y"""
+        return _a.dot(y)
+
     if use_jac:
         if banded:
-            r = ode(_linear_func, _linear_banded_jac)
+            # `a` is constant, so build its banded Jacobian only once
+            jac = _banded_jac_matrix(a, lband, uband)
         else:
-            r = ode(_linear_func, _linear_jac)
+            jac = a
+
+        def jf(t, y, _jac=jac):
+            """Jacobian of a * y is a, in banded storage if requested."""
+            return _jac
+
+        r = ode(f, jf)
     else:
-        r = ode(_linear_func)
+        r = ode(f)
 
     if solver is None:
-        if np.iscomplexobj(a):
-            solver = "zvode"
-        else:
-            solver = "vode"
+        solver = "zvode" if a.dtype.kind == "c" else "vode"
 
     r.set_integrator(solver,
                      with_jacobian=with_jacobian,
@@ -94,160 +97,250 @@ def _solve_linear_sys(a, y0, tend=1, dt=0.1,
                      )
     t0 = 0
     r.set_initial_value(y0, t0)
-    r.set_f_params(a)
-    r.set_jac_params(a)
-
-    t = [t0]
-    y = [y0.copy()]
-    while r.successful() and r.t < tend:
-        r.integrate(r.t + dt)
-        t.append(r.t)
-        y.append(r.y.copy())
-
-    t = np.array(t)
-    y = np.array(y)
+
+    nsteps = int(round((tend - t0) / dt))
+    t = t0 + np.arange(nsteps + 1) * dt
+    y = np.empty((nsteps + 1, y0.size), dtype=np.result_type(y0, a, 1.0))
+    y[0] = y0
+    # With the default (non-step) mode, the solvers step past each output
+    # time and interpolate back to it, so integrating grid point by grid
+    # point does not constrain the internal step size.
+    for i in range(1, nsteps + 1):
+        y[i] = r.integrate(t[i])
+        assert r.successful()
+        assert_allclose(r.t, t[i])
     return t, y
 
 
-def _analytical_solution(a, y0, t):
+def _analytical_solution(a, y0, t, scale=1):
     """
     Analytical solution to the linear differential equations dy/dt = a*y.
 
     The solution is only valid if `a` is diagonalizable.
 
+    If `scale` is given, the system solved is dy/dt = scale*a*y instead. It
+    has the eigenvectors of `a`, so e.g. a complex multiple of a real matrix
+    only needs the real eigendecomposition.
+
     Returns a 2-D array with shape (len(t), len(y0)).
     """
     lam, v = np.linalg.eig(a)
+    lam = lam * scale
     c = np.linalg.solve(v, y0)
-    e = c * np.exp(lam * t.reshape(-1, 1))
-    sol = e.dot(v.T)
-    return sol
+    e = np.empty((t.size, lam.size), dtype=np.result_type(lam, c))
+    np.multiply.outer(t, lam, out=e)
+    np.exp(e, out=e)
+    e *= c
+    return e @ v.T
+
+
+# Test the "lsoda", "vode" and "zvode" solvers of the `ode` class
+# with a system that has a banded Jacobian matrix.
 
+# This does not test the Jacobian evaluation (banded or not)
+# of "lsoda" due to the nonstiff nature of the equations.
 
-def test_banded_ode_solvers():
-    # Test the "lsoda", "vode" and "zvode" solvers of the `ode` class
-    # with a system that has a banded Jacobian matrix.
+t_exact = np.arange(5) * 0.25
 
-    # This test does not test the Jacobian evaluation (banded or not)
-    # of "lsoda" due to the nonstiff nature of the equations.
+# --- Real arrays for testing the "lsoda" and "vode" solvers ---
 
-    t_exact = np.linspace(0, 1.0, 5)
+# lband = 2, uband = 1:
+a_real = np.array([[-0.6, 0.1, 0.0, 0.0, 0.0],
+                   [0.2, -0.5, 0.9, 0.0, 0.0],
+                   [0.1, 0.1, -0.4, 0.1, 0.0],
+                   [0.0, 0.3, -0.1, -0.9, -0.3],
+                   [0.0, 0.0, 0.1, 0.1, -0.7]])
 
-    # --- Real arrays for testing the "lsoda" and "vode" solvers ---
+# lband = 0, uband = 1:
+a_real_upper = np.triu(a_real)
 
-    # lband = 2, uband = 1:
-    a_real = np.array([[-0.6, 0.1, 0.0, 0.0, 0.0],
-                       [0.2, -0.5, 0.9, 0.0, 0.0],
-                       [0.1, 0.1, -0.4, 0.1, 0.0],
-                       [0.0, 0.3, -0.1, -0.9, -0.3],
-                       [0.0, 0.0, 0.1, 0.1, -0.7]])
+# lband = 2, uband = 0:
+a_real_lower = np.tril(a_real)
 
-    # lband = 0, uband = 1:
-    a_real_upper = np.triu(a_real)
+# lband = 0, uband = 0:
+a_real_diag = np.triu(a_real_lower)
 
-    # lband = 2, uband = 0:
-    a_real_lower = np.tril(a_real)
+real_matrices = [a_real, a_real_upper, a_real_lower, a_real_diag]
+real_bands = [(2, 1), (0, 1), (2, 0), (0, 0)]
 
-    # lband = 0, uband = 0:
-    a_real_diag = np.triu(a_real_lower)
+# --- Complex arrays for testing the "zvode" solver ---
 
-    real_matrices = [a_real, a_real_upper, a_real_lower, a_real_diag]
-    real_solutions = []
+# Both are a complex multiple of one of the real matrices.
+complex_factor = 1 - 0.5j
 
+# complex, lband = 2, uband = 1:
+a_complex = complex_factor * a_real
+
+# complex, lband = 0, uband = 0:
+a_complex_diag = complex_factor * a_real_diag
+
+complex_matrices = [a_complex, a_complex_diag]
+complex_bases = [a_real, a_real_diag]
+complex_bands = [(2, 1), (0, 0)]
+
+
+def test_known_bands():
+    # The band widths passed to the solvers must match the matrices.
+    for a, bands in zip(real_matrices + complex_matrices,
+                        real_bands + complex_bands):
+        assert _band_count(a) == bands
+
+
+def _solver_configs(solvers):
+    """Yield the (solver, method, use_jac, with_jacobian, banded) combinations
+    that select distinct code paths of the `ode` integrators.
+
+    "lsoda" switches between methods automatically and ignores both `method`
+    and `with_jacobian`. "vode" and "zvode" only look at `with_jacobian` when
+    neither a Jacobian function nor the band widths are given.
+    """
+    for solver, meth, use_jac, with_jac, banded in itertools.product(
+            solvers,
+            ['bdf', 'adams'],   # method
+            [False, True],      # use_jac
+            [False, True],      # with_jacobian
+            [False, True]):     # banded
+        if solver == 'lsoda' and (meth != 'bdf' or with_jac):
+            continue
+        if with_jac and (use_jac or banded):
+            continue
+        yield solver, meth, use_jac, with_jac, banded
+
+
+# The exact solutions only depend on the matrix, so they are computed once per
+# module rather than for each of the parametrized solver configurations.
+@pytest.fixture(scope="module")
+def real_cases():
+    """List of (a, y0, y_exact) for each of `real_matrices`."""
+    cases = []
     for a in real_matrices:
         y0 = np.arange(1, a.shape[0] + 1)
-        y_exact = _analytical_solution(a, y0, t_exact)
-        real_solutions.append((y0, t_exact, y_exact))
-
-    def check_real(idx, solver, meth, use_jac, with_jac, banded):
-        a = real_matrices[idx]
-        y0, t_exact, y_exact = real_solutions[idx]
-        t, y = _solve_linear_sys(a, y0,
-                                 tend=t_exact[-1],
-                                 dt=t_exact[1] - t_exact[0],
-                                 solver=solver,
-                                 method=meth,
-                                 use_jac=use_jac,
-                                 with_jacobian=with_jac,
-                                 banded=banded)
-        assert_allclose(t, t_exact)
-        assert_allclose(y, y_exact)
-
-    for idx in range(len(real_matrices)):
-        p = [['vode', 'lsoda'],  # solver
-             ['bdf', 'adams'],   # method
-             [False, True],      # use_jac
-             [False, True],      # with_jacobian
-             [False, True]]      # banded
-        for solver, meth, use_jac, with_jac, banded in itertools.product(*p):
-            check_real(idx, solver, meth, use_jac, with_jac, banded)
-
-    # --- Complex arrays for testing the "zvode" solver ---
-
-    # complex, lband = 2, uband = 1:
-    a_complex = a_real - 0.5j * a_real
-
-    # complex, lband = 0, uband = 0:
-    a_complex_diag = np.diag(np.diag(a_complex))
-
-    complex_matrices = [a_complex, a_complex_diag]
-    complex_solutions = []
-
-    for a in complex_matrices:
+        cases.append((a, y0, _analytical_solution(a, y0, t_exact)))
+    return cases
+
+
+@pytest.fixture(scope="module")
+def complex_cases():
+    """List of (a, y0, y_exact) for each of `complex_matrices`."""
+    cases = []
+    for a, base in zip(complex_matrices, complex_bases):
         y0 = np.arange(1, a.shape[0] + 1) + 1j
-        y_exact = _analytical_solution(a, y0, t_exact)
-        complex_solutions.append((y0, t_exact, y_exact))
-
-    def check_complex(idx, solver, meth, use_jac, with_jac, banded):
-        a = complex_matrices[idx]
-        y0, t_exact, y_exact = complex_solutions[idx]
-        t, y = _solve_linear_sys(a, y0,
-                                 tend=t_exact[-1],
-                                 dt=t_exact[1] - t_exact[0],
-                                 solver=solver,
-                                 method=meth,
-                                 use_jac=use_jac,
-                                 with_jacobian=with_jac,
-                                 banded=banded)
-        assert_allclose(t, t_exact)
-        assert_allclose(y, y_exact)
-
-    for idx in range(len(complex_matrices)):
-        p = [['bdf', 'adams'],   # method
-             [False, True],      # use_jac
-             [False, True],      # with_jacobian
-             [False, True]]      # banded
-        for meth, use_jac, with_jac, banded in itertools.product(*p):
-            check_complex(idx, "zvode", meth, use_jac, with_jac, banded)
+        y_exact = _analytical_solution(base, y0, t_exact, scale=complex_factor)
+        cases.append((a, y0, y_exact))
+    return cases
+
+
+@pytest.mark.parametrize(
+    "idx, solver, meth, use_jac, with_jac, banded",
+    [(idx, *config) for idx in range(len(real_matrices))
+     for config in _solver_configs(['vode', 'lsoda'])]
+)
+def test_banded_ode_solvers_real(idx, solver, meth, use_jac, with_jac, banded,
+                                 real_cases):
+    a, y0, y_exact = real_cases[idx]
+    lband, uband = real_bands[idx]
+    t, y = _solve_linear_sys(a, y0,
+                             tend=t_exact[-1],
+                             dt=t_exact[1] - t_exact[0],
+                             solver=solver,
+                             method=meth,
+                             use_jac=use_jac,
+                             with_jacobian=with_jac,
+                             banded=banded,
+                             lband=lband, uband=uband)
+    assert_allclose(t, t_exact)
+    assert_allclose(y, y_exact)
+
+
+@pytest.mark.parametrize(
+    "idx, solver, meth, use_jac, with_jac, banded",
+    [(idx, *config) for idx in range(len(complex_matrices))
+     for config in _solver_configs(['zvode'])]
+)
+def test_banded_ode_solvers_complex(idx, solver, meth, use_jac, with_jac, banded,
+                                    complex_cases):
+    a, y0, y_exact = complex_cases[idx]
+    lband, uband = complex_bands[idx]
+    t, y = _solve_linear_sys(a, y0,
+                             tend=t_exact[-1],
+                             dt=t_exact[1] - t_exact[0],
+                             solver=solver,
+                             method=meth,
+                             use_jac=use_jac,
+                             with_jacobian=with_jac,
+                             banded=banded,
+                             lband=lband, uband=uband)
+    assert_allclose(t, t_exact)
+    assert_allclose(y, y_exact)
 
 # lsoda requires a stiffer problem to switch to stiff solver
 # Use the Robertson equation with surrounding trivial equations to make banded
-
-def stiff_f(t, y):
-    return np.array([
-        y[0],
-        -0.04 * y[1] + 1e4 * y[2] * y[3],
-        0.04 * y[1] - 1e4 * y[2] * y[3] - 3e7 * y[2]**2,
-        3e7 * y[2]**2,
-        y[4]
-    ])
-
-def stiff_jac(t, y):
-    return np.array([
-        [1,     0,                            0,         0, 0],
-        [0, -0.04,                     1e4*y[3],  1e4*y[2], 0],
-        [0,  0.04, -1e4 * y[3] - 3e7 * 2 * y[2], -1e4*y[2], 0],
-        [0,     0,                   3e7*2*y[2],         0, 0],
-        [0,     0,                            0,         0, 1]
-    ])
-
-def banded_stiff_jac(t, y):
-    return np.array([
-        [0,     0,                    0,  1e4*y[2], 0],
-        [0,     0,             1e4*y[3], -1e4*y[2], 0],
-        [1, -0.04, -1e4*y[3]-3e7*2*y[2],         0, 1],
-        [0,  0.04,           3e7*2*y[2],         0, 0]
-    ])
+# The callbacks below convert `y` to a list first: arithmetic on Python floats
+# is much cheaper than on NumPy scalars, and they are called very often.
+# They fill and return `out`, which `_solve_robertson_lsoda` preallocates once
+# for the whole integration; lsoda copies the values it gets back.
+# The Jacobian buffers are deliberately C-contiguous: the wrapper takes the
+# result as a C-ordered array and does the column-major copy into LSODA's
+# work array itself, so a Fortran-ordered buffer would add a copy per call.
+
+def stiff_f(t, y, out=None):
+    if out is None:
+        out = np.empty(5)
+    y = y.tolist()
+    a = 1e4 * y[2] * y[3]
+    b = 3e7 * y[2]**2
+    out[0] = y[0]
+    out[1] = -0.04 * y[1] + a
+    out[2] = 0.04 * y[1] - a - b
+    out[3] = b
+    out[4] = y[4]
+    return out
+
+def _stiff_jac_out():
+    """Output array for `stiff_jac`, with its constant entries filled in."""
+    out = np.zeros((5, 5))
+    out[0, 0] = 1
+    out[1, 1] = -0.04
+    out[2, 1] = 0.04
+    out[4, 4] = 1
+    return out
+
+def stiff_jac(t, y, out=None):
+    if out is None:
+        out = _stiff_jac_out()
+    y = y.tolist()
+    c = 1e4 * y[3]
+    d = 1e4 * y[2]
+    e = 3e7 * 2 * y[2]
+    out[1, 2] = c
+    out[1, 3] = d
+    out[2, 2] = -c - e
+    out[2, 3] = -d
+    out[3, 2] = e
+    return out
+
+def _banded_stiff_jac_out():
+    """Output array for `banded_stiff_jac`, with its constant entries filled in."""
+    out = np.zeros((4, 5))
+    out[2, 0] = 1
+    out[2, 1] = -0.04
+    out[2, 4] = 1
+    out[3, 1] = 0.04
+    return out
+
+def banded_stiff_jac(t, y, out=None):
+    if out is None:
+        out = _banded_stiff_jac_out()
+    y = y.tolist()
+    c = 1e4 * y[3]
+    d = 1e4 * y[2]
+    e = 3e7 * 2 * y[2]
+    out[0, 3] = d
+    out[1, 2] = c
+    out[1, 3] = -d
+    out[2, 2] = -c - e
+    out[3, 2] = e
+    return out
 
 def test_banded_lsoda():
     # expected solution is given by problem with full jacobian
@@ -264,9 +357,9 @@ def _solve_robertson_lsoda(use_jac, banded):
 
     if use_jac:
         if banded:
-            jac = banded_stiff_jac
+            jac = functools.partial(banded_stiff_jac, out=_banded_stiff_jac_out())
         else:
-            jac = stiff_jac
+            jac = functools.partial(stiff_jac, out=_stiff_jac_out())
     else:
         jac = None
 
@@ -277,7 +370,7 @@ def _solve_robertson_lsoda(use_jac, banded):
         lband = None
         uband = None
 
-    r = ode(stiff_f, jac)
+    r = ode(functools.partial(stiff_f, out=np.empty(5)), jac)
     r.set_integrator('lsoda',
                      lband=lband, uband=uband,
                      rtol=1e-9, atol=1e-10,
@@ -288,17 +381,17 @@ def _solve_robertson_lsoda(use_jac, banded):
     y0 = np.array([1.0, 1.0, 0.0, 0.0, 1.0])
     r.set_initial_value(y0, t0)
 
-    t = [t0]
-    y = [y0.copy()]
-    while r.successful() and r.t < tend:
-        r.integrate(r.t + dt)
-        t.append(r.t)
-        y.append(r.y.copy())
+    nsteps = int(round((tend - t0) / dt))
+    t = t0 + np.arange(nsteps + 1) * dt
+    y = np.empty((nsteps + 1, y0.size), dtype=y0.dtype)
+    y[0] = y0
+    for i in range(1, nsteps + 1):
+        y[i] = r.integrate(t[i])
+        assert r.successful()
+        assert_allclose(r.t, t[i])
 
     # Ensure that the Jacobian was evaluated
     # iwork[12] has the number of Jacobian evaluations.
     assert r._integrator.iwork[12] > 0
 
-    t = np.array(t)
-    y = np.array(y)
     return t, y